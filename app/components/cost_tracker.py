@@ -72,9 +72,14 @@ def cost_dashboard(cost_tracker):
     
     # Calculate total costs safely
     try:
-        fixed_costs = costs_df[costs_df['cost_type'] == 'fixed']['cost_value'].sum() if 'cost_type' in costs_df.columns and 'cost_value' in costs_df.columns else 0
-        variable_costs = costs_df[costs_df['cost_type'] == 'variable']['cost_value'].sum() if 'cost_type' in costs_df.columns and 'cost_value' in costs_df.columns else 0
-        per_unit_costs = costs_df[costs_df['cost_type'] == 'per_unit']['cost_value'].sum() if 'cost_type' in costs_df.columns and 'cost_value' in costs_df.columns else 0
+        if 'cost_type' in costs_df.columns and 'cost_value' in costs_df.columns:
+            # Total every cost type in one pass instead of filtering once per type
+            totals_by_type = costs_df.groupby('cost_type')['cost_value'].sum()
+            fixed_costs = totals_by_type.get('fixed', 0)
+            variable_costs = totals_by_type.get('variable', 0)
+            per_unit_costs = totals_by_type.get('per_unit', 0)
+        else:
+            fixed_costs = variable_costs = per_unit_costs = 0
     except Exception as e:
         st.error(f"Error calculating costs: {str(e)}")
         fixed_costs = variable_costs = per_unit_costs = 0
@@ -165,10 +170,11 @@ def manage_business_costs(cost_tracker):
             st.subheader("Add New Business Cost")
             
             # Category selection
+            category_names = cost_tracker.get_category_names()
             category_id = st.selectbox(
                 "Category", 
                 options=categories_df['id'].tolist(),
-                format_func=lambda x: categories_df[categories_df['id'] == x]['name'].iloc[0]
+                format_func=lambda x: category_names[x]
             )
             
             # Cost details
@@ -229,10 +235,11 @@ def manage_business_costs(cost_tracker):
         try:
             categories_df = cost_tracker.get_all_cost_categories()
             if not categories_df.empty and 'id' in categories_df.columns:
+                category_names = cost_tracker.get_category_names()
                 filter_category = st.selectbox(
                     "Filter by Category",
                     options=[0] + categories_df['id'].tolist(),
-                    format_func=lambda x: "All Categories" if x == 0 else categories_df[categories_df['id'] == x]['name'].iloc[0]
+                    format_func=lambda x: "All Categories" if x == 0 else category_names[x]
                 )
             else:
                 st.warning("No categories available for filtering")
@@ -329,11 +336,12 @@ def manage_business_costs(cost_tracker):
                         if cost_data.get('category_id') in categories_df['id'].values:
                             current_cat_index = categories_df.index[categories_df['id'] == cost_data['category_id']].tolist()[0]
                         
+                        category_names = cost_tracker.get_category_names()
                         category_id = st.selectbox(
                             "Category", 
                             options=categories_df['id'].tolist(),
                             index=current_cat_index,
-                            format_func=lambda x: categories_df[categories_df['id'] == x]['name'].iloc[0]
+                            format_func=lambda x: category_names[x]
                         )
                     else:
                         st.error("No categories available")
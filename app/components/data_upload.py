@@ -109,10 +109,13 @@ def data_upload(data_loader):
                     
                     # Display found data categories
                     with st.expander("Data Categories Found", expanded=True):
-                        st.write("Brands:", len(data_loader.get_unique_values("Brand")))
-                        st.write("Product Groups:", len(data_loader.get_unique_values("Product Group")))
-                        st.write("Primary Categories:", len(data_loader.get_unique_values("Primary Category")))
-                        st.write("Product Names:", len(data_loader.get_unique_values("Product Name")))
+                        unique_values = data_loader.get_unique_values_bulk(
+                            ["Brand", "Product Group", "Primary Category", "Product Name"]
+                        )
+                        st.write("Brands:", len(unique_values["Brand"]))
+                        st.write("Product Groups:", len(unique_values["Product Group"]))
+                        st.write("Primary Categories:", len(unique_values["Primary Category"]))
+                        st.write("Product Names:", len(unique_values["Product Name"]))
                     
                     st.session_state.initialized_db = True
                 else:
@@ -400,12 +400,12 @@ def cost_simulation(calculator):
                     elec_data = []
                     for item in cost_data['electricity_costs']:
                         elec_data.append({
-                            "Process": item['process_name'],
-                            "Machine": item['machine_name'],
-                            "Time (min)": item['process_time_min'],
-                            "Machine Power (W)": item['wattage'],
-                            "Energy (kWh)": item['energy_kwh'],
-                            "Cost per Run": f"£{item['cost_per_run']:.3f}"
+                            "Process": item.process_name,
+                            "Machine": item.machine_name,
+                            "Time (min)": item.process_time_min,
+                            "Machine Power (W)": item.wattage,
+                            "Energy (kWh)": item.energy_kwh,
+                            "Cost per Run": f"£{item.cost_per_run:.3f}"
                         })
                     
                     elec_df = pd.DataFrame(elec_data)
@@ -475,12 +475,12 @@ def cost_simulation(calculator):
                     elec_data = []
                     for item in cost_data['electricity_costs']:
                         elec_data.append({
-                            "Process": item['process_name'],
-                            "Machine": item['machine_name'],
-                            "Time (min)": item['process_time_min'],
-                            "Machine Power (W)": item['wattage'],
-                            "Energy (kWh)": item['energy_kwh'],
-                            "Cost per Run": f"£{item['cost_per_run']:.3f}"
+                            "Process": item.process_name,
+                            "Machine": item.machine_name,
+                            "Time (min)": item.process_time_min,
+                            "Machine Power (W)": item.wattage,
+                            "Energy (kWh)": item.energy_kwh,
+                            "Cost per Run": f"£{item.cost_per_run:.3f}"
                         })
                     
                     elec_df = pd.DataFrame(elec_data)
@@ -1,26 +1,23 @@
-import json
 import os
 import sys
-import sqlite3
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from app.utils.cost_tracker import CostTracker
+from app.utils.json_io import load_json_file
 
 def import_electricity_costs():
     """Import electricity costs from the JSON file."""
     print("Importing electricity costs...")
     
     # Load electricity costs from JSON
-    with open('app/data/electricity_costs.json', 'r') as f:
-        data = json.load(f)
+    data = load_json_file('app/data/electricity_costs.json')
     
     # Flatten the data for import
     electricity_costs = []
     for process_type in ['print_electricity', 'embroidery_electricity']:
-        for item in data[process_type]:
-            electricity_costs.append(item)
+        electricity_costs.extend(data[process_type])
     
     # Create cost tracker and import data
     cost_tracker = CostTracker()
@@ -34,14 +31,12 @@ def import_material_costs():
     print("Importing material costs...")
     
     # Load material costs from JSON
-    with open('app/data/material_costs.json', 'r') as f:
-        data = json.load(f)
+    data = load_json_file('app/data/material_costs.json')
     
     # Flatten the data for import
     material_costs = []
     for material_type in ['film_costs', 'ink_costs', 'powder_costs', 'backing_costs']:
-        for item in data[material_type]:
-            material_costs.append(item)
+        material_costs.extend(data[material_type])
     
     # Create cost tracker and import data
     cost_tracker = CostTracker()
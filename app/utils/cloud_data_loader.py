@@ -1,7 +1,14 @@
 import pandas as pd
+import numpy as np
 import os
+import time
 import streamlit as st
 import io
+import zipfile
+import concurrent.futures
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from app.utils.json_io import load_json_file
 
 # Try to import Supabase with error handling
 try:
@@ -11,9 +18,153 @@ except ImportError:
     SUPABASE_AVAILABLE = False
     st.error("Supabase library could not be imported. Please install with: pip install supabase==1.0.3 httpx==0.23.3")
 
+PRODUCTS_JSON_PATH = 'app/data/products_data.json'
+
+# Product columns stored in the products table and used by the UI
+PRODUCT_COLUMNS = ['Product Group', 'Brand', 'Price', 'Primary Category', 'Product Name', 'Web Size', 'Colour Name', 'Colour Code']
+
+# Low-cardinality filter columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ['Brand', 'Product Group', 'Primary Category']
+
+# Columns returned together by the get_all_unique_filter_values RPC
+FILTER_COLUMNS = ['Brand', 'Product Group', 'Primary Category']
+
+def read_products_json(path=PRODUCTS_JSON_PATH):
+    """Parse the internal product JSON into a DataFrame."""
+    data = load_json_file(path)
+    
+    df = pd.DataFrame(data['products'])
+    df.columns = df.columns.str.strip()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    
+    df.attrs['metadata'] = data.get('metadata', {})
+    return df
+
+# Shared across sessions without a per-call copy, so callers must treat the frame as read-only
+@st.cache_resource(show_spinner=False)
+def _load_products_df(path, mtime):
+    """Load the internal product data, cached per JSON file modification time."""
+    return read_products_json(path)
+
+# Indexes are read-only too, so they are shared the same way
+@st.cache_resource(show_spinner=False)
+def _load_product_indexes(path, mtime):
+    """Map each value of the categorical columns to the (sorted) row positions holding it."""
+    df = _load_products_df(path, mtime)
+    return {
+        column: df.groupby(column, observed=True).indices
+        for column in CATEGORICAL_COLUMNS
+        if column in df.columns
+    }
+
+@st.cache_resource(show_spinner=False)
+def _load_product_names_lower(path, mtime):
+    """Lower-cased product names as a numpy array, for case-insensitive substring search."""
+    df = _load_products_df(path, mtime)
+    return df['Product Name'].fillna('').astype(str).str.lower().to_numpy()
+
+@st.cache_data(show_spinner=False)
+def _load_unique_values(path, mtime, column):
+    """Sorted unique values of a column of the internal product data."""
+    df = _load_products_df(path, mtime)
+    if column not in df.columns:
+        return []
+    if isinstance(df[column].dtype, pd.CategoricalDtype):
+        # Categories are already the sorted distinct non-null values
+        return df[column].cat.categories.tolist()
+    return sorted(df[column].dropna().unique().tolist())
+
+def _stream_excel_columns(excel_file, sheet_name, columns, required_column=None):
+    """Read only the given columns of an .xlsx worksheet with openpyxl's read-only streaming mode.
+    
+    The second sheet row is the header, matching pd.read_excel(header=1). Columns missing
+    from the header are left out of the result, and rows with an empty required_column
+    are skipped while streaming.
+    """
+    wb = load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(min_row=2, values_only=True)
+        header = next(rows, ())
+        
+        # Map each wanted column to its first position in the header
+        positions = {}
+        for i, name in enumerate(header):
+            if name in columns and name not in positions:
+                positions[name] = i
+        found_columns = [col for col in columns if col in positions]
+        indices = [positions[col] for col in found_columns]
+        required_index = positions.get(required_column)
+        
+        records = []
+        for row in rows:
+            if required_index is not None and (required_index >= len(row) or row[required_index] is None):
+                continue
+            records.append(tuple(row[i] if i < len(row) else None for i in indices))
+    finally:
+        wb.close()
+    
+    return pd.DataFrame(records, columns=found_columns)
+
+def _products_mtime():
+    """Modification time of the internal product JSON, or None if it is missing."""
+    try:
+        return os.path.getmtime(PRODUCTS_JSON_PATH)
+    except OSError:
+        return None
+
+# Bumped whenever the products table changes so per-session cached state can be refreshed
+_products_version = 0
+
+# Other processes can change the products table too, so re-check cached database state after this many seconds
+DB_READY_TTL = 300
+
+@st.cache_resource(show_spinner=False)
+def _get_supabase_client(url, key):
+    """Create the Supabase client once per process and share it across sessions."""
+    return create_client(url, key)
+
+@st.cache_data(show_spinner=False, ttl=300)
+def _fetch_unique_values_multi(_client, columns):
+    """Fetch distinct values for several columns with a single RPC round-trip."""
+    response = _client.rpc('get_unique_values_multi', {'column_names': list(columns)}).execute()
+    data = response.data or {}
+    return {column: data.get(column) or [] for column in columns}
+
+@st.cache_data(show_spinner=False, ttl=300)
+def _fetch_all_filter_values(_client):
+    """Fetch the distinct values of every filter column with one RPC round-trip."""
+    response = _client.rpc('get_all_unique_filter_values', {}).execute()
+    data = response.data or {}
+    return {column: data.get(column) or [] for column in FILTER_COLUMNS}
+
+# RPC functions whose migration has not been applied, so they are not called again
+_missing_rpcs = set()
+
+def _is_missing_function(error):
+    """Check whether an RPC error means the database function does not exist."""
+    return getattr(error, 'code', None) in ('PGRST202', '42883') or 'Could not find the function' in str(error)
+
+def _on_products_changed():
+    """Mark cached product state as stale after a product load."""
+    global _products_version
+    _products_version += 1
+    _fetch_unique_values_multi.clear()
+    _fetch_all_filter_values.clear()
+
 class CloudDataLoader:
     def __init__(self):
         """Initialize the cloud data loader with Supabase connection."""
+        # Checked once; the internal data file ships with the app
+        self._has_internal_data = os.path.exists(PRODUCTS_JSON_PATH)
+        
+        # Show ingestion details only when DEBUG is set in secrets
+        try:
+            self.debug = bool(st.secrets.get("DEBUG", False))
+        except Exception:
+            self.debug = False
+        
         if not SUPABASE_AVAILABLE:
             st.warning("Running in degraded mode: Supabase connection not available")
             self.supabase = None
@@ -39,7 +190,7 @@ class CloudDataLoader:
         self.supabase = None
         
         try:
-            self.supabase = create_client(self.supabase_url, self.supabase_key)
+            self.supabase = _get_supabase_client(self.supabase_url, self.supabase_key)
             st.success("Connected to Supabase")
         except Exception as e:
             st.warning(f"Supabase connection failed: {str(e)}")
@@ -51,8 +202,7 @@ class CloudDataLoader:
         try:
             if not self.supabase:
                 # If no Supabase connection, just verify we have internal data
-                json_path = 'app/data/products_data.json'
-                if os.path.exists(json_path):
+                if self._has_internal_data:
                     st.info("🔄 Using internal product data (Supabase unavailable)")
                     return True, "Internal product data available - application ready"
                 else:
@@ -60,114 +210,177 @@ class CloudDataLoader:
             
             # Use internal JSON file instead of Excel
             if excel_file is None:
-                json_path = 'app/data/products_data.json'
-                st.info(f"Loading product data from internal JSON: {json_path}")
+                json_path = PRODUCTS_JSON_PATH
+                if self.debug:
+                    st.info(f"Loading product data from internal JSON: {json_path}")
                 
                 # Check if internal JSON file exists
-                if not os.path.exists(json_path):
+                mtime = _products_mtime()
+                if mtime is None:
                     return False, f"Internal product data file not found: {json_path}"
                 
-                # Load data from JSON
-                import json
-                with open(json_path, 'r') as f:
-                    data = json.load(f)
-                
-                # Convert to DataFrame
-                df = pd.DataFrame(data['products'])
+                # Load cached DataFrame
+                df = _load_products_df(json_path, mtime)
                 
                 # Print metadata info
-                metadata = data.get('metadata', {})
-                st.write(f"Data source: {metadata.get('source', 'Unknown')}")
-                st.write(f"Total products: {metadata.get('total_products', len(df))}")
+                if self.debug:
+                    metadata = df.attrs.get('metadata', {})
+                    st.write(f"Data source: {metadata.get('source', 'Unknown')}")
+                    st.write(f"Total products: {metadata.get('total_products', len(df))}")
             else:
                 # Handle uploaded Excel files (fallback)
-                st.info(f"Reading uploaded Excel file, sheet: {sheet_name}")
+                if self.debug:
+                    st.info(f"Reading uploaded Excel file, sheet: {sheet_name}")
                 
-                # Handle both file paths and bytes
-                if isinstance(excel_file, str):
-                    df = pd.read_excel(excel_file, sheet_name=sheet_name, header=1)
-                else:
-                    # Wrap bytes in BytesIO to avoid warning
-                    if isinstance(excel_file, bytes):
-                        excel_file = io.BytesIO(excel_file)
-                    df = pd.read_excel(excel_file, sheet_name=sheet_name, header=1)
+                # Wrap bytes in BytesIO to avoid warning
+                if isinstance(excel_file, bytes):
+                    excel_file = io.BytesIO(excel_file)
                 
                 # Select only the required columns
                 required_columns = ['Product Group', 'Brand', 'Cust Single Price', 'Primary Category', 'Product Name', 'Web Size', 'Colour Name', 'Colour Code']
                 
+                try:
+                    # Stream just the required columns of .xlsx workbooks
+                    df = _stream_excel_columns(excel_file, sheet_name, required_columns, required_column='Cust Single Price')
+                except (InvalidFileException, zipfile.BadZipFile):
+                    # Not an .xlsx workbook (e.g. legacy .xls), let pandas pick the engine
+                    if not isinstance(excel_file, str):
+                        excel_file.seek(0)
+                    # Only parse the required columns, reading the text ones as plain strings
+                    df = pd.read_excel(
+                        excel_file,
+                        sheet_name=sheet_name,
+                        header=1,
+                        usecols=lambda col: col in required_columns,
+                        dtype={col: str for col in required_columns if col != 'Cust Single Price'}
+                    )
+                
                 # Check if all required columns exist
                 missing_columns = [col for col in required_columns if col not in df.columns]
                 if missing_columns:
                     return False, f"Missing required columns: {missing_columns}"
                 
-                # Select only the required columns
-                df = df[required_columns].copy()
-                
-                # Rename 'Cust Single Price' to 'Price' for consistency
-                df.rename(columns={'Cust Single Price': 'Price'}, inplace=True)
+                # Select only the required columns, renaming 'Cust Single Price' to 'Price' for consistency
+                df = df[required_columns].rename(columns={'Cust Single Price': 'Price'})
             
             # Ensure all required columns exist
-            required_columns = ['Product Group', 'Brand', 'Price', 'Primary Category', 'Product Name', 'Web Size', 'Colour Name', 'Colour Code']
-            missing_columns = [col for col in required_columns if col not in df.columns]
+            missing_columns = [col for col in PRODUCT_COLUMNS if col not in df.columns]
             if missing_columns:
                 return False, f"Missing required columns in data: {missing_columns}"
             
-            # Clean column names
-            df.columns = [col.strip() if isinstance(col, str) else col for col in df.columns]
+            # Remove rows with missing price data (combine any further row filters into this mask)
+            keep = df['Price'].notna().to_numpy()
+            if not keep.all():
+                df = df.loc[keep]
             
-            # Remove rows with missing price data
-            df = df.dropna(subset=['Price'])
+            # Print column names and a sample of the data to help with debugging
+            if self.debug:
+                with st.expander("Ingestion details", expanded=False):
+                    st.write(f"Columns in processed data: {df.columns.tolist()}")
+                    st.write("Sample data:")
+                    st.write(df.head(3))
             
-            # Print column names to help with debugging
-            st.write(f"Columns in processed data: {df.columns.tolist()}")
+            # The data has been read and validated, so only now clear the existing products
+            delete_error = self._delete_all_products()
+            if delete_error:
+                st.warning(f"Could not delete existing products: {delete_error}")
             
-            # Print a sample of the data
-            st.write("Sample data:")
-            st.write(df.head(3))
+            # Insert in concurrent batches
+            errors = self._insert_batches(df)
             
-            # Delete all existing products
-            try:
-                # Use a WHERE clause that matches all records
-                self.supabase.table('products').delete().eq('id', 'id').execute()
-            except Exception as e:
-                # If that fails, try with a different approach
-                try:
-                    self.supabase.table('products').delete().neq('id', 0).execute()
-                except Exception as e2:
-                    st.warning(f"Could not delete existing products: {str(e2)}")
+            _on_products_changed()
             
-            # Convert DataFrame to dict and insert in batches
-            records = df.to_dict('records')
-            batch_size = 1000
-            
-            for i in range(0, len(records), batch_size):
-                batch = records[i:i+batch_size]
-                self.supabase.table('products').insert(batch).execute()
+            if errors:
+                return False, f"Failed to insert {len(errors)} batch(es) of products: {errors[0]}"
             
             return True, f"Successfully loaded {len(df)} products from Excel file"
         except Exception as e:
             return False, f"Error loading data: {str(e)}"
     
+    def _delete_all_products(self):
+        """Delete all existing products, returning an error message on failure."""
+        try:
+            # SERIAL ids start at 1, so this WHERE clause matches all records
+            self.supabase.table('products').delete().neq('id', 0).execute()
+        except Exception as e:
+            return str(e)
+        return None
+    
+    def _insert_batches(self, df, batch_size=5000, concurrency=8):
+        """Insert DataFrame rows in batches over a bounded thread pool, returning any batch errors."""
+        errors = []
+        in_flight = set()
+        
+        def collect(futures):
+            errors.extend(str(future.exception()) for future in futures if future.exception() is not None)
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for start in range(0, len(df), batch_size):
+                # Convert one batch at a time so only the in-flight batches exist as dicts
+                batch = df.iloc[start:start + batch_size].to_dict('records')
+                in_flight.add(executor.submit(self._insert_batch, batch))
+                
+                if len(in_flight) >= concurrency:
+                    done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                    collect(done)
+            
+            collect(concurrent.futures.wait(in_flight).done)
+        
+        return errors
+    
+    def _insert_batch(self, batch):
+        """Insert a single batch of product records."""
+        self.supabase.table('products').insert(batch).execute()
+    
     def get_unique_values(self, column):
         """Get unique values for a specific column from the database."""
         try:
             if not self.supabase:
                 # Fallback to internal data
                 return self._get_unique_values_from_json(column)
+            
+            # Filter columns are fetched together once and served from the cached dict
+            if column in FILTER_COLUMNS and 'get_all_unique_filter_values' not in _missing_rpcs:
+                try:
+                    return list(_fetch_all_filter_values(self.supabase)[column])
+                except Exception as e:
+                    # Fall back to the per-column RPC below
+                    if _is_missing_function(e):
+                        _missing_rpcs.add('get_all_unique_filter_values')
                 
             response = self.supabase.rpc(
                 'get_unique_values', 
                 {'column_name': column}
             ).execute()
             
-            if hasattr(response, 'data') and response.data:
-                return [item['value'] for item in response.data if item['value'] is not None]
-            return []
+            data = response.data or []
+            return [item['value'] for item in data if item['value'] is not None]
         except Exception as e:
             st.error(f"Error getting unique values for {column}: {str(e)}")
             # Fallback to internal data on error
             return self._get_unique_values_from_json(column)
     
+    def get_unique_values_bulk(self, columns):
+        """Get unique values for several columns at once, keyed by column name."""
+        try:
+            if not self.supabase:
+                # Fallback to internal data
+                return {column: self._get_unique_values_from_json(column) for column in columns}
+            
+            if 'get_unique_values_multi' not in _missing_rpcs:
+                try:
+                    return _fetch_unique_values_multi(self.supabase, tuple(columns))
+                except Exception as e:
+                    # Fall back to fetching each column separately
+                    if _is_missing_function(e):
+                        _missing_rpcs.add('get_unique_values_multi')
+            
+            return {column: self.get_unique_values(column) for column in columns}
+        except Exception as e:
+            st.error(f"Error getting unique values for {', '.join(columns)}: {str(e)}")
+            # Fallback to internal data on error
+            return {column: self._get_unique_values_from_json(column) for column in columns}
+    
     def get_filtered_products(self, brand=None, product_group=None, primary_category=None, product_name=None, web_size=None, colour_name=None):
         """Get products filtered by the selected criteria."""
         try:
@@ -175,7 +388,8 @@ class CloudDataLoader:
                 # Fallback to internal data
                 return self._get_filtered_products_from_json(brand, product_group, primary_category, product_name, web_size, colour_name)
                 
-            query = self.supabase.table('products').select('*')
+            # Only fetch the product columns, not the id or any legacy columns
+            query = self.supabase.table('products').select(','.join(f'"{col}"' for col in PRODUCT_COLUMNS))
             
             if brand:
                 query = query.eq('Brand', brand)
@@ -195,60 +409,52 @@ class CloudDataLoader:
             if colour_name:
                 query = query.eq('Colour Name', colour_name)
             
-            # Execute the query
-            response = query.execute()
-            results_df = pd.DataFrame()
-            
-            if hasattr(response, 'data'):
-                results_df = pd.DataFrame(response.data)
-            
-            return results_df
+            # Execute the query, sorted by name on the server
+            response = query.order('Product Name').execute()
+            return pd.DataFrame(response.data or [])
         except Exception as e:
             st.error(f"Error getting filtered products: {str(e)}")
             # Fallback to internal data on error
             return self._get_filtered_products_from_json(brand, product_group, primary_category, product_name, web_size, colour_name)
     
     def is_db_initialized(self):
+        """Check if the database has been initialized, reusing the result until the products change."""
+        cached = st.session_state.get('db_ready')
+        if cached is not None and cached[0] == _products_version:
+            # Loads elsewhere don't bump the version, so the result also expires
+            if time.time() - cached[2] < DB_READY_TTL:
+                return cached[1]
+        
+        ready = self._check_db_initialized()
+        st.session_state['db_ready'] = (_products_version, ready, time.time())
+        return ready
+    
+    def _check_db_initialized(self):
         """Check if the database has been initialized with product data."""
-        try:
-            # First check if we have internal JSON data available
-            json_path = 'app/data/products_data.json'
-            if os.path.exists(json_path):
-                # If we have internal data, consider it initialized
-                return True
-            
-            # If no internal data, try Supabase
-            if not self.supabase:
-                return False
-                
-            response = self.supabase.table('products').select('count', count='exact').limit(1).execute()
-            
-            if hasattr(response, 'count'):
-                return response.count > 0
+        # If we have internal data, consider it initialized without asking Supabase
+        if self._has_internal_data:
+            return True
+        
+        # If no internal data, try Supabase
+        if not self.supabase:
             return False
+        
+        try:
+            # Fetching a single id is enough; an exact count would scan the whole table
+            response = self.supabase.table('products').select('id').limit(1).execute()
+            return bool(response.data)
         except Exception as e:
-            # If Supabase fails but we have internal data, still return True
-            json_path = 'app/data/products_data.json'
-            if os.path.exists(json_path):
-                return True
             st.error(f"Error checking if DB is initialized: {str(e)}")
             return False
     
     def _get_unique_values_from_json(self, column):
         """Get unique values from internal JSON data as fallback."""
         try:
-            json_path = 'app/data/products_data.json'
-            if not os.path.exists(json_path):
+            mtime = _products_mtime()
+            if mtime is None:
                 return []
             
-            import json
-            with open(json_path, 'r') as f:
-                data = json.load(f)
-            
-            df = pd.DataFrame(data['products'])
-            if column in df.columns:
-                return sorted(df[column].dropna().unique().tolist())
-            return []
+            return _load_unique_values(PRODUCTS_JSON_PATH, mtime, column)
         except Exception as e:
             st.error(f"Error reading internal data for {column}: {str(e)}")
             return []
@@ -256,28 +462,31 @@ class CloudDataLoader:
     def _get_filtered_products_from_json(self, brand=None, product_group=None, primary_category=None, product_name=None, web_size=None, colour_name=None):
         """Get filtered products from internal JSON data as fallback."""
         try:
-            json_path = 'app/data/products_data.json'
-            if not os.path.exists(json_path):
+            mtime = _products_mtime()
+            if mtime is None:
                 return pd.DataFrame()
             
-            import json
-            with open(json_path, 'r') as f:
-                data = json.load(f)
+            df = _load_products_df(PRODUCTS_JSON_PATH, mtime)
+            indexes = _load_product_indexes(PRODUCTS_JSON_PATH, mtime)
             
-            df = pd.DataFrame(data['products'])
+            # Narrow rows with the per-column indexes before any scanning filters
+            rows = None
+            for column, value in (('Brand', brand), ('Product Group', product_group), ('Primary Category', primary_category)):
+                if value:
+                    matches = indexes[column].get(value, np.empty(0, dtype=np.intp))
+                    rows = matches if rows is None else np.intersect1d(rows, matches, assume_unique=True)
             
-            # Apply filters
-            if brand:
-                df = df[df['Brand'] == brand]
-            
-            if product_group:
-                df = df[df['Product Group'] == product_group]
-            
-            if primary_category:
-                df = df[df['Primary Category'] == primary_category]
+            if rows is not None:
+                df = df.iloc[rows]
             
+            # Apply remaining filters
             if product_name:
-                df = df[df['Product Name'].str.contains(product_name, case=False, na=False)]
+                names_lower = _load_product_names_lower(PRODUCTS_JSON_PATH, mtime)
+                if rows is not None:
+                    names_lower = names_lower[rows]
+                query = product_name.lower()
+                mask = np.fromiter((query in name for name in names_lower), dtype=bool, count=len(names_lower))
+                df = df[mask]
             
             if web_size:
                 df = df[df['Web Size'] == web_size]
@@ -285,7 +494,9 @@ class CloudDataLoader:
             if colour_name:
                 df = df[df['Colour Name'] == colour_name]
             
-            return df
+            # Categoricals are only for the cached indexes, so hand the UI plain object columns
+            # (astype also returns a new frame, leaving the shared cached one untouched)
+            return df.astype({column: object for column in CATEGORICAL_COLUMNS if column in df.columns})
         except Exception as e:
             st.error(f"Error filtering internal data: {str(e)}")
             return pd.DataFrame() 
\ No newline at end of file
@@ -1,28 +1,233 @@
-import json
+import copy
 import os
 import math
+from collections import namedtuple
+from datetime import date
+from app.utils.json_io import load_json_file, write_json_file
+
+# Parsed settings keyed by (absolute path, mtime_ns) so repeated instantiations
+# only stat the file instead of re-reading and re-parsing it
+_SETTINGS_CACHE = {}
+
+# Job cost breakdowns keyed by (settings cache key, job kind, job type,
+# quantity), shared by every calculator reading the same file version
+_JOB_COST_CACHE = {}
+_JOB_COST_CACHE_SIZE = 256
+
+# Electricity cost of running one machine for one process
+ElectricityCost = namedtuple('ElectricityCost', [
+    'process_type', 'process_name', 'machine_name', 'wattage',
+    'process_time_min', 'energy_kwh', 'cost_per_kwh', 'cost_per_run'
+])
+
+# Placeholder material costs per logo size
+_MATERIAL_COSTS = {
+    "Film": {
+        "Small Logo": 0.158,
+        "Large Logo": 0.395
+    },
+    "Ink": {
+        "Small Logo": 0.18,
+        "Large Logo": 0.24
+    },
+    "Powder": {
+        "Small Logo": 0.09,
+        "Large Logo": 0.18
+    },
+    "Backing": {
+        "Small Logo": 0.04,
+        "Large Logo": 0.92
+    }
+}
+
+# Print job plans: (logo size, (machine, process) steps, labor cost per item).
+# Steps for machines missing from settings are dropped when plans are built.
+_PRINT_PLAN_TEMPLATES = {
+    "print_1_small": ("Small Logo", (
+        ("DTF Printer", "standard_print"),
+        ("Oven", "standard_bake"),
+        ("Heat Press", "standard_press")
+    ), 1.50),
+    "print_2_small": ("Small Logo", (
+        ("DTF Printer", "standard_print"),
+        ("Oven", "standard_bake"),
+        ("Heat Press", "standard_press"),
+        ("Heat Press", "standard_press"),  # Second logo press
+        ("DTF Printer", "small_logo_print"),
+        ("Oven", "small_logo_bake"),
+        ("Heat Press", "small_logo_press"),
+        ("Heat Press", "small_logo_press")  # Second small logo press
+    ), 2.25),
+    "print_large_back_front": ("Large Logo", (
+        ("DTF Printer", "standard_print"),
+        ("Oven", "standard_bake"),
+        ("Heat Press", "standard_press")
+    ), 1.75)
+}
+_DEFAULT_PRINT_TYPE = "print_1_small"
+_PRINT_MATERIALS = ("Film", "Ink", "Powder")
+
+# Embroidery job plans: (logo size, processes run on every embroidery machine,
+# labor cost per item, thread cost per item)
+_EMBROIDERY_PLAN_TEMPLATES = {
+    "emb_1_small": ("Small Logo", ("small_logo",), 2.00, 1.25),
+    "emb_1_large": ("Large Logo", ("large_logo",), 2.50, 1.75),
+    # Combined small and large logo; materials use the larger one
+    "emb_front_back": ("Large Logo", ("small_logo", "large_logo"), 4.00, 3.00)
+}
+_DEFAULT_EMBROIDERY_TYPE = "emb_1_small"
+
+def _to_thousandths(amount):
+    """Convert a money amount to an integer number of thousandths."""
+    return round(amount * 1000)
+
+def _validate_settings(settings):
+    """Check the settings shape once and fill in missing sections so accessors need no guards."""
+    if not isinstance(settings, dict):
+        raise ValueError("Settings must be a JSON object")
+    for key, value in settings.items():
+        if key.endswith("_machines") and not (isinstance(value, list) and all(
+                isinstance(m, dict) and "name" in m and isinstance(m.get("wattage"), (int, float)) for m in value)):
+            raise ValueError(f"Every entry in '{key}' must be an object with a name and a numeric wattage")
+    settings.setdefault("print_machines", [])
+    settings.setdefault("embroidery_machines", [])
+    settings.setdefault("electricity_rate", {"cost_per_kwh": 0.4})
+    settings.setdefault("process_times", {})
+    settings.setdefault("usage_factors", {})
+    return settings
 
 class CostCalculator:
     def __init__(self, settings_file='app/data/machine_settings.json'):
-        """Initialize the cost calculator with machine settings."""
+        """Initialize the cost calculator; settings are loaded on first use."""
         self.settings_file = settings_file
-        self.settings = self._load_settings()
+        self._settings = None
+        # (cache key, settings) as last read from or written to disk
+        self._saved = (None, None)
+
+    def _ensure_loaded(self):
+        """Load settings and build the indexes the first time any of them is needed."""
+        if self._settings is None:
+            self._settings = self._load_settings()
+            self._rebuild_indexes()
+
+    @property
+    def settings(self):
+        """The machine settings, loaded from the settings file on first access."""
+        self._ensure_loaded()
+        return self._settings
+
+    @settings.setter
+    def settings(self, settings):
+        """Replace the settings in memory; they are written by save_settings()."""
+        self._settings = _validate_settings(settings)
+        self._saved = (None, None)
+        self._rebuild_indexes()
         
     def _load_settings(self):
         """Load settings from JSON file."""
-        if os.path.exists(self.settings_file):
-            try:
-                with open(self.settings_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading settings: {str(e)}")
-                return self._create_default_settings()
-        else:
+        self._saved = (None, None)
+        try:
+            # A single stat both checks the file exists and keys the cache
+            key = (os.path.abspath(self.settings_file), os.stat(self.settings_file).st_mtime_ns)
+            settings = _SETTINGS_CACHE.get(key)
+            if settings is None:
+                settings = _validate_settings(load_json_file(self.settings_file))
+                _SETTINGS_CACHE[key] = settings
+        except FileNotFoundError:
             return self._create_default_settings()
+        except Exception as e:
+            # Use defaults for this session but leave the unreadable file for the user to fix
+            print(f"Error loading settings: {str(e)}")
+            return self._default_settings()
+        self._saved = (key, settings)
+        # Callers edit settings in place before saving, so hand out a copy
+        return copy.deepcopy(settings)
+
+    def _rebuild_indexes(self):
+        """Index machines by type and name, cache the electricity rate and resolve job plans."""
+        self._machine_index = {
+            key[:-len("_machines")]: {machine["name"]: machine for machine in machines}
+            for key, machines in self.settings.items()
+            if key.endswith("_machines")
+        }
+        self._process_time_index = self.settings["process_times"]
+        self._rate = self.settings["electricity_rate"].get("cost_per_kwh", 0.4)
+
+        # Resolve job plans against the machines that currently exist, with
+        # their electricity costs worked out up front. Money amounts are kept
+        # as integer thousandths so job totals sum exactly.
+        print_machines = self._machine_index.get("print", {})
+        self._print_plans = {}
+        for print_type, (logo_size, steps, labor_cost_per_item) in _PRINT_PLAN_TEMPLATES.items():
+            electricity_costs = tuple(self._calculate_process_electricity_costs(
+                ("print", machine_name, "print", process_name)
+                for machine_name, process_name in steps if machine_name in print_machines))
+            self._print_plans[print_type] = (
+                logo_size,
+                electricity_costs,
+                sum(_to_thousandths(cost_data.cost_per_run) for cost_data in electricity_costs),
+                tuple((material, cost_per_logo, _to_thousandths(cost_per_logo))
+                      for material in _PRINT_MATERIALS
+                      for cost_per_logo in [self.calculate_material_cost(material, "", logo_size)]),
+                _to_thousandths(labor_cost_per_item)
+            )
+        embroidery_machines = self._machine_index.get("embroidery", {})
+        self._embroidery_plans = {}
+        for embroidery_type, (logo_size, process_names, labor_cost_per_item, thread_cost) in _EMBROIDERY_PLAN_TEMPLATES.items():
+            electricity_costs = tuple(self._calculate_process_electricity_costs(
+                ("embroidery", machine_name, "embroidery", process_name)
+                for machine_name in embroidery_machines for process_name in process_names))
+            # For embroidery we need backing and thread
+            backing_per_logo = self.calculate_material_cost("Backing", "", logo_size)
+            self._embroidery_plans[embroidery_type] = (
+                logo_size,
+                electricity_costs,
+                sum(_to_thousandths(cost_data.cost_per_run) for cost_data in electricity_costs),
+                (("Backing", backing_per_logo, _to_thousandths(backing_per_logo)),
+                 ("Thread", thread_cost, _to_thousandths(thread_cost))),  # Thread cost (approximated)
+                _to_thousandths(labor_cost_per_item)
+            )
+
+    def _cache_settings(self, settings):
+        """Replace any cached parse of the settings file with the saved settings."""
+        path = os.path.abspath(self.settings_file)
+        for key in [k for k in _SETTINGS_CACHE if k[0] == path]:
+            del _SETTINGS_CACHE[key]
+        for key in [k for k in _JOB_COST_CACHE if k[0][0] == path]:
+            del _JOB_COST_CACHE[key]
+        key = (path, os.stat(self.settings_file).st_mtime_ns)
+        _SETTINGS_CACHE[key] = copy.deepcopy(settings)
+        self._saved = (key, _SETTINGS_CACHE[key])
+
+    def _is_saved(self, settings):
+        """Check whether settings match what is on disk, so the write can be skipped."""
+        saved_key, saved_settings = self._saved
+        if saved_settings is None or settings != saved_settings:
+            return False
+        try:
+            return (os.path.abspath(self.settings_file), os.stat(self.settings_file).st_mtime_ns) == saved_key
+        except OSError:
+            return False
+
+    def _write_settings(self, settings):
+        """Write settings via a temporary file so readers never see a partial file."""
+        write_json_file(self.settings_file, settings)
     
     def _create_default_settings(self):
         """Create default settings if file doesn't exist."""
-        default_settings = {
+        default_settings = self._default_settings()
+        
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
+        
+        # Save default settings
+        self._write_settings(default_settings)
+        
+        return default_settings
+    
+    def _default_settings(self):
+        """Default machine settings, used when the settings file is missing or invalid."""
+        return {
             "print_machines": [
                 {
                     "name": "DTF Printer",
@@ -77,34 +282,29 @@ class CostCalculator:
                 }
             }
         }
-        
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
-        
-        # Save default settings
-        with open(self.settings_file, 'w') as f:
-            json.dump(default_settings, f, indent=4)
-        
-        return default_settings
     
     def save_settings(self, new_settings):
         """Save updated settings."""
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(new_settings, f, indent=4)
-            self.settings = new_settings
-            return True, "Settings saved successfully"
+            _validate_settings(new_settings)
+            unchanged = self._is_saved(new_settings)
+            if not unchanged:
+                self._write_settings(new_settings)
+                self._cache_settings(new_settings)
+            # Assign directly so the setter doesn't forget what was just saved
+            self._settings = new_settings
+            self._rebuild_indexes()
+            return True, "Settings unchanged" if unchanged else "Settings saved successfully"
         except Exception as e:
             return False, f"Error saving settings: {str(e)}"
     
     def update_electricity_rate(self, cost_per_kwh):
         """Update the electricity cost per kWh."""
-        if "electricity_rate" not in self.settings:
-            self.settings["electricity_rate"] = {}
+        if self.settings["electricity_rate"].get("cost_per_kwh") == cost_per_kwh:
+            return True, "Settings unchanged"
         
-        from datetime import datetime
         self.settings["electricity_rate"]["cost_per_kwh"] = cost_per_kwh
-        self.settings["electricity_rate"]["last_updated"] = datetime.now().strftime("%Y-%m-%d")
+        self.settings["electricity_rate"]["last_updated"] = date.today().isoformat()
         
         return self.save_settings(self.settings)
     
@@ -117,6 +317,8 @@ class CostCalculator:
         
         for machine in self.settings[machine_key]:
             if machine["name"] == machine_name:
+                if machine.get("wattage") == new_wattage:
+                    return True, "Settings unchanged"
                 machine["wattage"] = new_wattage
                 return self.save_settings(self.settings)
         
@@ -124,324 +326,137 @@ class CostCalculator:
     
     def update_process_time(self, process_type, process_name, new_time):
         """Update the processing time for a specific process."""
-        if "process_times" not in self.settings:
-            self.settings["process_times"] = {}
-        
-        if process_type not in self.settings["process_times"]:
-            self.settings["process_times"][process_type] = {}
+        process_times = self.settings["process_times"].setdefault(process_type, {})
+        if process_times.get(process_name) == new_time:
+            return True, "Settings unchanged"
         
-        self.settings["process_times"][process_type][process_name] = new_time
+        process_times[process_name] = new_time
         return self.save_settings(self.settings)
     
     def update_usage_factor(self, process_type, factor_name, new_factor):
         """Update the usage factor for a specific process."""
-        if "usage_factors" not in self.settings:
-            self.settings["usage_factors"] = {}
-        
-        if process_type not in self.settings["usage_factors"]:
-            self.settings["usage_factors"][process_type] = {}
+        usage_factors = self.settings["usage_factors"].setdefault(process_type, {})
+        if usage_factors.get(factor_name) == new_factor:
+            return True, "Settings unchanged"
         
-        self.settings["usage_factors"][process_type][factor_name] = new_factor
+        usage_factors[factor_name] = new_factor
         return self.save_settings(self.settings)
     
     def get_electricity_rate(self):
         """Get the current electricity rate."""
-        if "electricity_rate" in self.settings:
-            return self.settings["electricity_rate"].get("cost_per_kwh", 0.4)
-        return 0.4
+        return self.settings["electricity_rate"].get("cost_per_kwh", 0.4)
     
     def get_machine_wattage(self, machine_type, machine_name):
         """Get the wattage for a specific machine."""
-        machine_key = f"{machine_type}_machines"
-        
-        if machine_key not in self.settings:
-            return 0
-        
-        for machine in self.settings[machine_key]:
+        # Read the live settings, like the other getters, so in-place edits show up before a save
+        for machine in self.settings.get(f"{machine_type}_machines", []):
             if machine["name"] == machine_name:
                 return machine["wattage"]
-        
         return 0
     
     def get_process_time(self, process_type, process_name):
         """Get the processing time for a specific process."""
-        if "process_times" not in self.settings:
-            return 0
-        
-        if process_type not in self.settings["process_times"]:
-            return 0
-        
-        return self.settings["process_times"][process_type].get(process_name, 0)
+        return self.settings["process_times"].get(process_type, {}).get(process_name, 0)
     
     def get_usage_factor(self, process_type, factor_name):
         """Get the usage factor for a specific process."""
-        if "usage_factors" not in self.settings:
-            return 0
-        
-        if process_type not in self.settings["usage_factors"]:
-            return 0
-        
-        return self.settings["usage_factors"][process_type].get(factor_name, 0)
+        return self.settings["usage_factors"].get(process_type, {}).get(factor_name, 0)
     
     def calculate_electricity_cost(self, machine_type, machine_name, process_type, process_name):
         """Calculate the electricity cost for a specific machine and process."""
-        wattage = self.get_machine_wattage(machine_type, machine_name)
-        process_time_minutes = self.get_process_time(process_type, process_name)
-        
-        # Convert minutes to hours
-        hours = process_time_minutes / 60
-        
-        # Calculate energy in kilowatt-hours: (watts × hours) ÷ 1000
-        energy_kwh = (wattage * hours) / 1000
-        
-        # Get electricity rate per kWh
-        electricity_rate = self.get_electricity_rate()
-        
-        # Calculate cost
-        cost = energy_kwh * electricity_rate
-        
-        return {
-            "process_type": process_type,
-            "process_name": process_name,
-            "machine_name": machine_name,
-            "wattage": wattage,
-            "process_time_min": process_time_minutes,
-            "energy_kwh": energy_kwh,
-            "cost_per_kwh": electricity_rate,
-            "cost_per_run": round(cost, 3)  # Rounded to 3 decimal places
-        }
-    
+        return self._calculate_process_electricity_costs(
+            [(machine_type, machine_name, process_type, process_name)])[0]
+
+    def _calculate_process_electricity_costs(self, processes):
+        """Calculate electricity costs for an iterable of process tuples in one pass."""
+        self._ensure_loaded()
+        rate = self._rate
+        machine_index = self._machine_index
+        process_time_index = self._process_time_index
+        costs = []
+        for machine_type, machine_name, process_type, process_name in processes:
+            machine = machine_index.get(machine_type, {}).get(machine_name)
+            wattage = machine["wattage"] if machine else 0
+            process_time_minutes = process_time_index.get(process_type, {}).get(process_name, 0)
+            # Energy in kilowatt-hours: (watts × hours) ÷ 1000, in this order so
+            # rounded per-run costs match exactly
+            energy_kwh = (wattage * (process_time_minutes / 60)) / 1000
+            costs.append(ElectricityCost(
+                process_type, process_name, machine_name, wattage,
+                process_time_minutes, energy_kwh, rate,
+                round(energy_kwh * rate, 3)  # Rounded to 3 decimal places
+            ))
+        return costs
+
     def calculate_material_cost(self, material_type, material_name, logo_size):
         """
         Calculate the material cost for a specific material and logo size.
         This is a placeholder method - in a real implementation, you would
         retrieve material costs from your database.
         """
-        # Placeholder material costs based on your image
-        material_costs = {
-            "Film": {
-                "Small Logo": 0.158,
-                "Large Logo": 0.395
-            },
-            "Ink": {
-                "Small Logo": 0.18,
-                "Large Logo": 0.24
-            },
-            "Powder": {
-                "Small Logo": 0.09,
-                "Large Logo": 0.18
-            },
-            "Backing": {
-                "Small Logo": 0.04,
-                "Large Logo": 0.92
-            }
-        }
-        
-        if material_type in material_costs and logo_size in material_costs[material_type]:
-            return material_costs[material_type][logo_size]
-        return 0
+        return _MATERIAL_COSTS.get(material_type, {}).get(logo_size, 0)
     
+    def _cached_job_cost(self, calculate, job_kind, job_type, quantity):
+        """Return a job cost breakdown, reusing one computed for the same settings version."""
+        self._ensure_loaded()
+        settings_key = self._saved[0]
+        if settings_key is None:
+            return calculate(job_type, quantity)
+        key = (settings_key, job_kind, job_type, quantity)
+        cost_breakdown = _JOB_COST_CACHE.get(key)
+        if cost_breakdown is None:
+            cost_breakdown = calculate(job_type, quantity)
+            if len(_JOB_COST_CACHE) >= _JOB_COST_CACHE_SIZE:
+                _JOB_COST_CACHE.clear()
+            _JOB_COST_CACHE[key] = cost_breakdown
+        # Hand out a copy so callers can't change the shared cached breakdown
+        return {
+            **cost_breakdown,
+            "electricity_costs": list(cost_breakdown["electricity_costs"]),
+            "material_costs": {material: dict(costs) for material, costs in cost_breakdown["material_costs"].items()}
+        }
+
     def calculate_print_cost(self, print_type, quantity=1):
         """Calculate the total cost for a printing job."""
-        total_cost = 0
-        cost_breakdown = {
-            "electricity_costs": [],
-            "material_costs": {},
-            "total_electricity_cost": 0,
-            "total_material_cost": 0,
-            "labor_cost": 0,
-            "total_cost": 0
-        }
-        
-        # Get available machine names
-        print_machines = {machine["name"]: machine for machine in self.settings.get("print_machines", [])}
-        
-        # Determine logo size and process details based on print type
-        if print_type == "print_1_small":
-            logo_size = "Small Logo"
-            processes = []
-            
-            # Only add processes for machines that exist in settings
-            if "DTF Printer" in print_machines:
-                processes.append(("print", "DTF Printer", "print", "standard_print"))
-            if "Oven" in print_machines:
-                processes.append(("print", "Oven", "print", "standard_bake"))
-            if "Heat Press" in print_machines:
-                processes.append(("print", "Heat Press", "print", "standard_press"))
-            
-            labor_cost_per_item = 1.50
-        elif print_type == "print_2_small":
-            logo_size = "Small Logo"
-            processes = []
-            
-            # First logo - only add processes for machines that exist
-            if "DTF Printer" in print_machines:
-                processes.append(("print", "DTF Printer", "print", "standard_print"))
-            if "Oven" in print_machines:
-                processes.append(("print", "Oven", "print", "standard_bake"))
-            if "Heat Press" in print_machines:
-                processes.append(("print", "Heat Press", "print", "standard_press"))
-                processes.append(("print", "Heat Press", "print", "standard_press")) # Second logo press
-            
-            # Second small logo
-            if "DTF Printer" in print_machines:
-                processes.append(("print", "DTF Printer", "print", "small_logo_print"))
-            if "Oven" in print_machines:
-                processes.append(("print", "Oven", "print", "small_logo_bake"))
-            if "Heat Press" in print_machines:
-                processes.append(("print", "Heat Press", "print", "small_logo_press"))
-                processes.append(("print", "Heat Press", "print", "small_logo_press")) # Second small logo press
-            
-            labor_cost_per_item = 2.25
-        elif print_type == "print_large_back_front":
-            logo_size = "Large Logo"
-            processes = []
-            
-            # Only add processes for machines that exist
-            if "DTF Printer" in print_machines:
-                processes.append(("print", "DTF Printer", "print", "standard_print"))
-            if "Oven" in print_machines:
-                processes.append(("print", "Oven", "print", "standard_bake"))
-            if "Heat Press" in print_machines:
-                processes.append(("print", "Heat Press", "print", "standard_press"))
-            
-            labor_cost_per_item = 1.75
-        else:  # Default for other print types
-            logo_size = "Small Logo"
-            processes = []
-            
-            # Only add processes for machines that exist
-            if "DTF Printer" in print_machines:
-                processes.append(("print", "DTF Printer", "print", "standard_print"))
-            if "Oven" in print_machines:
-                processes.append(("print", "Oven", "print", "standard_bake"))
-            if "Heat Press" in print_machines:
-                processes.append(("print", "Heat Press", "print", "standard_press"))
-            
-            labor_cost_per_item = 1.50
-        
-        # Calculate electricity costs
-        for machine_type, machine_name, process_type, process_name in processes:
-            cost_data = self.calculate_electricity_cost(machine_type, machine_name, process_type, process_name)
-            cost_breakdown["electricity_costs"].append(cost_data)
-            total_cost += cost_data["cost_per_run"] * quantity
-            cost_breakdown["total_electricity_cost"] += cost_data["cost_per_run"] * quantity
-        
-        # Calculate material costs
-        materials = ["Film", "Ink", "Powder"]
-        cost_breakdown["material_costs"] = {}
-        
-        for material in materials:
-            material_cost = self.calculate_material_cost(material, "", logo_size) * quantity
-            cost_breakdown["material_costs"][material] = {
-                "cost_per_logo": self.calculate_material_cost(material, "", logo_size),
-                "total_cost": material_cost
-            }
-            total_cost += material_cost
-            cost_breakdown["total_material_cost"] += material_cost
-        
-        # Add labor cost
-        labor_cost = labor_cost_per_item * quantity
-        cost_breakdown["labor_cost"] = labor_cost
-        total_cost += labor_cost
-        
-        # Set the total cost
-        cost_breakdown["total_cost"] = round(total_cost, 2)
-        
-        return cost_breakdown
-    
+        return self._cached_job_cost(self._calculate_print_cost, "print", print_type, quantity)
+
     def calculate_embroidery_cost(self, embroidery_type, quantity=1):
         """Calculate the total cost for an embroidery job."""
-        total_cost = 0
-        cost_breakdown = {
-            "electricity_costs": [],
-            "material_costs": {},
-            "total_electricity_cost": 0,
-            "total_material_cost": 0,
-            "labor_cost": 0,
-            "total_cost": 0
-        }
-        
-        # Get available machine names
-        embroidery_machines = {machine["name"]: machine for machine in self.settings.get("embroidery_machines", [])}
-        
-        # Determine logo size and process details based on embroidery type
-        if embroidery_type == "emb_1_small":
-            logo_size = "Small Logo"
-            processes = []
-            
-            # Only add processes for machines that exist
-            for machine_name in embroidery_machines.keys():
-                processes.append(("embroidery", machine_name, "embroidery", "small_logo"))
-            
-            labor_cost_per_item = 2.00
-            thread_cost = 1.25
-        elif embroidery_type == "emb_1_large":
-            logo_size = "Large Logo"
-            processes = []
-            
-            # Only add processes for machines that exist
-            for machine_name in embroidery_machines.keys():
-                processes.append(("embroidery", machine_name, "embroidery", "large_logo"))
-            
-            labor_cost_per_item = 2.50
-            thread_cost = 1.75
-        elif embroidery_type == "emb_front_back":
-            # Combined small and large logo
-            logo_size = "Large Logo"  # For material calculations we'll use the larger one
-            processes = []
-            
-            # Only add processes for machines that exist
-            for machine_name in embroidery_machines.keys():
-                processes.append(("embroidery", machine_name, "embroidery", "small_logo"))
-                processes.append(("embroidery", machine_name, "embroidery", "large_logo"))
-                
-            labor_cost_per_item = 4.00
-            thread_cost = 3.00
-        else:  # Default
-            logo_size = "Small Logo"
-            processes = []
-            
-            # Only add processes for machines that exist
-            for machine_name in embroidery_machines.keys():
-                processes.append(("embroidery", machine_name, "embroidery", "small_logo"))
-                
-            labor_cost_per_item = 2.00
-            thread_cost = 1.25
-        
-        # Calculate electricity costs
-        for machine_type, machine_name, process_type, process_name in processes:
-            cost_data = self.calculate_electricity_cost(machine_type, machine_name, process_type, process_name)
-            cost_breakdown["electricity_costs"].append(cost_data)
-            total_cost += cost_data["cost_per_run"] * quantity
-            cost_breakdown["total_electricity_cost"] += cost_data["cost_per_run"] * quantity
-        
-        # Calculate material costs - for embroidery we need backing and thread
-        cost_breakdown["material_costs"] = {}
+        return self._cached_job_cost(self._calculate_embroidery_cost, "embroidery", embroidery_type, quantity)
+
+    def _calculate_print_cost(self, print_type, quantity):
+        """Calculate the total cost for a printing job."""
+        return self._calculate_job_cost(
+            self._print_plans.get(print_type, self._print_plans[_DEFAULT_PRINT_TYPE]), quantity)
+    
+    def _calculate_embroidery_cost(self, embroidery_type, quantity):
+        """Calculate the total cost for an embroidery job."""
+        return self._calculate_job_cost(
+            self._embroidery_plans.get(embroidery_type, self._embroidery_plans[_DEFAULT_EMBROIDERY_TYPE]),
+            quantity)
+
+    def _calculate_job_cost(self, plan, quantity):
+        """Build the cost breakdown for a resolved job plan, summing money in integer thousandths."""
+        logo_size, electricity_costs, electricity_thou, materials, labor_thou = plan
+        
+        material_costs = {}
+        material_thou = 0
+        for material, cost_per_logo, cost_thou in materials:
+            material_costs[material] = {
+                "cost_per_logo": cost_per_logo,
+                "total_cost": cost_thou * quantity / 1000
+            }
+            material_thou += cost_thou
         
-        # Backing cost
-        backing_cost = self.calculate_material_cost("Backing", "", logo_size) * quantity
-        cost_breakdown["material_costs"]["Backing"] = {
-            "cost_per_logo": self.calculate_material_cost("Backing", "", logo_size),
-            "total_cost": backing_cost
-        }
-        total_cost += backing_cost
-        cost_breakdown["total_material_cost"] += backing_cost
+        # Round the total to pennies in the integer domain, halves rounding up,
+        # so x.xx5 totals don't depend on their binary float representation
+        total_pennies = ((electricity_thou + material_thou + labor_thou) * quantity + 5) // 10
         
-        # Thread cost (approximated)
-        cost_breakdown["material_costs"]["Thread"] = {
-            "cost_per_logo": thread_cost,
-            "total_cost": thread_cost * quantity
+        return {
+            "electricity_costs": list(electricity_costs),
+            "material_costs": material_costs,
+            "total_electricity_cost": electricity_thou * quantity / 1000,
+            "total_material_cost": material_thou * quantity / 1000,
+            "labor_cost": labor_thou * quantity / 1000,
+            "total_cost": total_pennies / 100
         }
-        total_cost += thread_cost * quantity
-        cost_breakdown["total_material_cost"] += thread_cost * quantity
-        
-        # Add labor cost
-        labor_cost = labor_cost_per_item * quantity
-        cost_breakdown["labor_cost"] = labor_cost
-        total_cost += labor_cost
-        
-        # Set the total cost
-        cost_breakdown["total_cost"] = round(total_cost, 2)
-        
-        return cost_breakdown 
\ No newline at end of file
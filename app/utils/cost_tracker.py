@@ -1,7 +1,122 @@
 import os
-import json
-import pandas as pd
-from datetime import datetime
+import copy
+import time
+import logging
+import functools
+from datetime import datetime, timedelta
+from app.utils.json_io import load_json_file, write_json_file
+
+logger = logging.getLogger(__name__)
+
+# Map service IDs to the electricity processes they run
+_PRINT_PROCESS_MAPPING = {
+    "print_1_small": ("Print", "Bake", "Press 1 Logo"),
+    "print_2_small": ("Print", "Bake", "Press 1 Logo", "Press 2 Logo",
+                      "Print (2nd small logo)", "Bake (2nd small logo)",
+                      "Press 1 Logo (2nd small logo)", "Press 2 Logo (2nd small logo)"),
+    "print_half_back_front": ("Print", "Bake", "Press 1 Logo"),
+    "print_large_back_front": ("Print", "Bake", "Press 1 Logo")
+}
+
+_EMB_PROCESS_MAPPING = {
+    "emb_1_small": ("Embroidery Small Logo",),
+    "emb_1_large": ("Embroidery Large Logo",),
+    "emb_front_back": ("Embroidery Small Logo", "Embroidery Large Logo")
+}
+
+# Map imported row types to the list they are stored in
+_ELECTRICITY_LIST_KEYS = {
+    "print": "print_electricity",
+    "embroidery": "embroidery_electricity"
+}
+
+_MATERIAL_LIST_KEYS = {
+    "film": "film_costs",
+    "ink": "ink_costs",
+    "powder": "powder_costs",
+    "backing": "backing_costs"
+}
+
+def _sort_frame(df, columns):
+    """Sort a frame by columns, skipping the sort when the rows are already in order."""
+    import pandas as pd
+    if pd.MultiIndex.from_frame(df[columns]).is_monotonic_increasing:
+        return df
+    return df.sort_values(columns)
+
+# Business costs written when no costs file exists; date_incurred is filled in on creation
+_DEFAULT_BUSINESS_COSTS = {
+    "categories": [
+        {"id": 1, "name": "Equipment", "description": "Costs related to equipment purchase and maintenance"},
+        {"id": 2, "name": "Utilities", "description": "Utility costs including electricity, water, etc."},
+        {"id": 3, "name": "Materials", "description": "Materials used in production process"},
+        {"id": 4, "name": "Labor", "description": "Labor costs"},
+        {"id": 5, "name": "Rent", "description": "Rent and property-related costs"},
+        {"id": 6, "name": "Software", "description": "Software and digital services"},
+        {"id": 7, "name": "Other", "description": "Miscellaneous business costs"}
+    ],
+    "costs": [
+        {"category_id": 2, "name": "Electricity", "description": "Monthly electricity bill", "cost_value": 0.4, "cost_type": "per_unit", "date_incurred": None, "recurring_period": "monthly"},
+        {"category_id": 5, "name": "Workshop Rent", "description": "Monthly workshop rent", "cost_value": 1000, "cost_type": "fixed", "date_incurred": None, "recurring_period": "monthly"}
+    ],
+    "electricity_rates": {
+        "cost_per_kwh": 0.34
+    },
+    "labor_rates": {
+        "printing": 10.50,
+        "embroidery": 12.00
+    }
+}
+
+# Directories already created or confirmed by _ensure_parent_dir
+_ensured_dirs = set()
+
+def _ensure_parent_dir(path):
+    """Create a file's parent directory once per process."""
+    directory = os.path.dirname(path)
+    if directory and directory not in _ensured_dirs:
+        os.makedirs(directory, exist_ok=True)
+        _ensured_dirs.add(directory)
+
+# Today's date string and the local time at which it goes stale
+_today = (0.0, "")
+
+def _today_str():
+    """Today's date as YYYY-MM-DD, formatted once per local day."""
+    global _today
+    now = time.time()
+    if now >= _today[0]:
+        today = datetime.fromtimestamp(now)
+        tomorrow = datetime.combine(today.date() + timedelta(days=1), datetime.min.time())
+        _today = (tomorrow.timestamp(), today.strftime("%Y-%m-%d"))
+    return _today[1]
+
+def _index_by(items, field):
+    """Index rows by a field, keeping the first row for each value as a linear scan would."""
+    index = {}
+    for item in items:
+        index.setdefault(item.get(field), item)
+    return index
+
+def _group_by(items, field):
+    """Group rows by a field, keeping their original order within each group."""
+    groups = {}
+    for item in items:
+        groups.setdefault(item.get(field), []).append(item)
+    return groups
+
+def _index_service_costs(services_data):
+    """Map service IDs to total cost, printing services taking precedence."""
+    index = {}
+    for group in ("printing_services", "embroidery_services"):
+        for service in services_data.get(group, []):
+            index.setdefault(service.get("id"), service.get("total_cost", 0))
+    return index
+
+@functools.lru_cache(maxsize=8)
+def _load_service_cost_index(services_file, mtime):
+    """Parse a services file into a service cost index; mtime keys out stale versions."""
+    return _index_service_costs(load_json_file(services_file))
 
 class CostTracker:
     def __init__(self, costs_file='app/data/business_costs.json'):
@@ -10,33 +125,65 @@ class CostTracker:
         self.services_file = 'app/data/printing_embroidery.json'
         self.electricity_file = 'app/data/electricity_costs.json'
         self.material_file = 'app/data/material_costs.json'
+        # Parsed JSON files as {path: (mtime_ns, data)}
+        self._json_cache = {}
+        # Indexes and frames built from those files as {(path, name): (cache entry, value)}
+        self._index_cache = {}
         self.business_costs = self._load_business_costs()
         self.electricity_costs = self._load_electricity_costs()
         self.material_costs = self._load_material_costs()
         
+    def _load_json(self, path, default_factory, label):
+        """Load a JSON file, reusing the parsed data until the file's mtime changes."""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return default_factory()
+        
+        try:
+            cached = self._json_cache.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            data = load_json_file(path)
+            self._json_cache[path] = (mtime, data)
+            return data
+        except Exception as e:
+            print(f"Error loading {label}: {str(e)}")
+            return default_factory()
+    
+    def _atomic_write_json(self, path, data, pretty=True):
+        """Write a JSON file atomically and cache the data that was written."""
+        write_json_file(path, data, indent=pretty)
+        # Remember what was just written so the next load skips re-parsing it
+        self._json_cache[path] = (os.stat(path).st_mtime_ns, data)
+    
+    def _get_index(self, path, name, load, build):
+        """Return a value derived from a JSON file, rebuilt only when the file is re-read or rewritten."""
+        data = load()
+        entry = self._json_cache.get(path)
+        cached = self._index_cache.get((path, name))
+        if entry is None or cached is None or cached[0] is not entry:
+            cached = (entry, build(data))
+            self._index_cache[(path, name)] = cached
+        return cached[1]
+    
+    def _get_costs_by_category_index(self):
+        """Business cost rows grouped by category ID, in file order."""
+        return self._get_index(self.costs_file, 'costs_by_category', self._load_business_costs,
+                               lambda data: _group_by(data.get("costs", []), 'category_id'))
+    
+    def _get_category_names(self):
+        """Lowercased category names, for case-insensitive duplicate checks."""
+        return self._get_index(self.costs_file, 'category_names', self._load_business_costs,
+                               lambda data: {cat['name'].lower() for cat in data.get("categories", [])})
+    
     def _load_electricity_costs(self):
         """Load electricity costs from JSON file or create default."""
-        if os.path.exists(self.electricity_file):
-            try:
-                with open(self.electricity_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading electricity costs: {str(e)}")
-                return self._create_default_electricity_costs()
-        else:
-            return self._create_default_electricity_costs()
+        return self._load_json(self.electricity_file, self._create_default_electricity_costs, "electricity costs")
     
     def _load_material_costs(self):
         """Load material costs from JSON file or create default."""
-        if os.path.exists(self.material_file):
-            try:
-                with open(self.material_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading material costs: {str(e)}")
-                return self._create_default_material_costs()
-        else:
-            return self._create_default_material_costs()
+        return self._load_json(self.material_file, self._create_default_material_costs, "material costs")
     
     def _create_default_electricity_costs(self):
         """Create default electricity costs if file doesn't exist."""
@@ -46,11 +193,10 @@ class CostTracker:
         }
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(self.electricity_file), exist_ok=True)
+        _ensure_parent_dir(self.electricity_file)
         
         # Save default costs
-        with open(self.electricity_file, 'w') as f:
-            json.dump(default_costs, f, indent=4)
+        self._atomic_write_json(self.electricity_file, default_costs)
         
         return default_costs
     
@@ -64,19 +210,17 @@ class CostTracker:
         }
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(self.material_file), exist_ok=True)
+        _ensure_parent_dir(self.material_file)
         
         # Save default costs
-        with open(self.material_file, 'w') as f:
-            json.dump(default_costs, f, indent=4)
+        self._atomic_write_json(self.material_file, default_costs)
         
         return default_costs
     
     def save_electricity_costs(self, electricity_data):
         """Save electricity costs to JSON file."""
         try:
-            with open(self.electricity_file, 'w') as f:
-                json.dump(electricity_data, f, indent=4)
+            self._atomic_write_json(self.electricity_file, electricity_data)
             self.electricity_costs = electricity_data
             return True, "Electricity costs saved successfully"
         except Exception as e:
@@ -85,8 +229,7 @@ class CostTracker:
     def save_material_costs(self, material_data):
         """Save material costs to JSON file."""
         try:
-            with open(self.material_file, 'w') as f:
-                json.dump(material_data, f, indent=4)
+            self._atomic_write_json(self.material_file, material_data)
             self.material_costs = material_data
             return True, "Material costs saved successfully"
         except Exception as e:
@@ -95,8 +238,7 @@ class CostTracker:
     def save_business_costs(self, business_data):
         """Save business costs to JSON file."""
         try:
-            with open(self.costs_file, 'w') as f:
-                json.dump(business_data, f, indent=4)
+            self._atomic_write_json(self.costs_file, business_data)
             self.business_costs = business_data
             return True, "Business costs saved successfully"
         except Exception as e:
@@ -107,111 +249,129 @@ class CostTracker:
     def import_electricity_costs_from_image(self, electricity_data):
         """Import electricity costs from the image data provided."""
         try:
-            # Load existing data
-            current_data = self._load_electricity_costs()
+            # Start from the data already loaded on this tracker
+            current_data = self.electricity_costs
             
             # Add new electricity data
             for item in electricity_data:
-                if item["process_type"] == "print":
-                    current_data["print_electricity"].append(item)
-                elif item["process_type"] == "embroidery":
-                    current_data["embroidery_electricity"].append(item)
+                target_key = _ELECTRICITY_LIST_KEYS.get(item["process_type"])
+                if target_key is not None:
+                    current_data[target_key].append(item)
             
             # Save updated data
-            with open(self.electricity_file, 'w') as f:
-                json.dump(current_data, f, indent=4)
+            self._atomic_write_json(self.electricity_file, current_data)
             
             # Update instance data
             self.electricity_costs = current_data
             return True
         except Exception as e:
+            # Drop any partially applied import by reloading from disk
+            self._json_cache.pop(self.electricity_file, None)
+            self.electricity_costs = self._load_electricity_costs()
             print(f"Error importing electricity costs: {str(e)}")
             return False
     
     def import_material_costs_from_image(self, material_data):
         """Import material costs from the image data provided."""
         try:
-            # Load existing data
-            current_data = self._load_material_costs()
+            # Start from the data already loaded on this tracker
+            current_data = self.material_costs
             
             # Add new material data to appropriate categories
             for item in material_data:
-                material_type = item["material_type"].lower()
-                if material_type == "film":
-                    current_data["film_costs"].append(item)
-                elif material_type == "ink":
-                    current_data["ink_costs"].append(item)
-                elif material_type == "powder":
-                    current_data["powder_costs"].append(item)
-                elif material_type == "backing":
-                    current_data["backing_costs"].append(item)
+                target_key = _MATERIAL_LIST_KEYS.get(item["material_type"].lower())
+                if target_key is not None:
+                    current_data[target_key].append(item)
             
             # Save updated data
-            with open(self.material_file, 'w') as f:
-                json.dump(current_data, f, indent=4)
+            self._atomic_write_json(self.material_file, current_data)
             
             # Update instance data
             self.material_costs = current_data
             return True
         except Exception as e:
+            # Drop any partially applied import by reloading from disk
+            self._json_cache.pop(self.material_file, None)
+            self.material_costs = self._load_material_costs()
             print(f"Error importing material costs: {str(e)}")
             return False
     
     def get_all_cost_categories(self):
         """Get all cost categories from business costs JSON."""
+        # pandas is only needed for tabular results, so import it on first use
+        import pandas as pd
         try:
-            data = self._load_business_costs()
-            categories = data.get("categories", [])
-            if categories:
-                df = pd.DataFrame(categories)
-                return df.sort_values('name') if 'name' in df.columns else df
-            else:
-                return pd.DataFrame(columns=['id', 'name', 'description'])
+            # Cached frames are shared, so hand out a copy callers are free to edit
+            return self._get_index(self.costs_file, 'categories_frame', self._load_business_costs,
+                                   self._build_categories_frame).copy()
         except Exception as e:
             print(f"Error getting cost categories: {str(e)}")
             return pd.DataFrame()
     
+    def get_category_names(self):
+        """Map category IDs to names without building a DataFrame, for lookups such as dropdown labels."""
+        return self._get_index(self.costs_file, 'category_names_by_id', self._load_business_costs,
+                               lambda data: {category_id: cat['name']
+                                             for category_id, cat in _index_by(data.get("categories", []), 'id').items()})
+    
+    def _build_categories_frame(self, data):
+        """Build the sorted categories frame from business costs data."""
+        import pandas as pd
+        categories = data.get("categories", [])
+        if categories:
+            df = pd.DataFrame(categories)
+            return _sort_frame(df, ['name']) if 'name' in df.columns else df
+        else:
+            return pd.DataFrame(columns=['id', 'name', 'description'])
+    
     def get_costs_by_category(self, category_id=None):
         """Get costs filtered by category from business costs JSON."""
+        import pandas as pd
         try:
-            data = self._load_business_costs()
-            costs = data.get("costs", [])
-            categories = data.get("categories", [])
-            
-            # Create category lookup
-            category_lookup = {cat['id']: cat['name'] for cat in categories}
-            
-            if category_id:
-                # Filter by specific category
-                filtered_costs = [cost for cost in costs if cost.get('category_id') == category_id]
-            else:
-                # Return all costs with category names
-                filtered_costs = costs.copy()
-                for cost in filtered_costs:
-                    cost['category_name'] = category_lookup.get(cost.get('category_id'), 'Unknown')
-            
-            if filtered_costs:
-                df = pd.DataFrame(filtered_costs)
-                return df.sort_values('name') if 'name' in df.columns else df
-            else:
-                columns = ['category_id', 'name', 'description', 'cost_value', 'cost_type', 'date_incurred', 'recurring_period']
-                if not category_id:
-                    columns.append('category_name')
-                return pd.DataFrame(columns=columns)
+            return self._get_index(self.costs_file, ('costs_frame', category_id), self._load_business_costs,
+                                   lambda data: self._build_costs_frame(data, category_id)).copy()
         except Exception as e:
             print(f"Error getting costs by category: {str(e)}")
             return pd.DataFrame()
     
+    def _build_costs_frame(self, data, category_id):
+        """Build the sorted costs frame from business costs data, optionally for one category."""
+        import pandas as pd
+        costs = data.get("costs", [])
+        categories = data.get("categories", [])
+        
+        # Create category lookup
+        category_lookup = {cat['id']: cat['name'] for cat in categories}
+        
+        if category_id:
+            # Filter by specific category
+            filtered_costs = self._get_costs_by_category_index().get(category_id, [])
+        else:
+            # Return all costs with category names, copying so the cached data stays untouched
+            filtered_costs = [
+                dict(cost, category_name=category_lookup.get(cost.get('category_id'), 'Unknown'))
+                for cost in costs
+            ]
+        
+        if filtered_costs:
+            df = pd.DataFrame(filtered_costs)
+            return _sort_frame(df, ['name']) if 'name' in df.columns else df
+        else:
+            columns = ['category_id', 'name', 'description', 'cost_value', 'cost_type', 'date_incurred', 'recurring_period']
+            if not category_id:
+                columns.append('category_name')
+            return pd.DataFrame(columns=columns)
+    
     def add_cost_category(self, name, description=""):
         """Add a new cost category to business costs JSON."""
         try:
-            data = self._load_business_costs()
-            categories = data.get("categories", [])
-            
             # Check if category already exists
-            if any(cat['name'].lower() == name.lower() for cat in categories):
+            if name.lower() in self._get_category_names():
                 return False, "Category already exists"
             
+            data = self._load_business_costs()
+            categories = data.get("categories", [])
+            
             # Find next available ID
             max_id = max([cat.get('id', 0) for cat in categories], default=0)
             new_id = max_id + 1
@@ -226,43 +386,46 @@ class CostTracker:
             
             # Save updated data
             data["categories"] = categories
-            with open(self.costs_file, 'w') as f:
-                json.dump(data, f, indent=4)
+            self._atomic_write_json(self.costs_file, data)
             
             # Update instance data
             self.business_costs = data
             return True, "Category added successfully"
         except Exception as e:
+            self._json_cache.pop(self.costs_file, None)
+            self.business_costs = self._load_business_costs()
             return False, f"Error adding category: {str(e)}"
     
     def add_business_cost(self, cost_data):
         """Add a new business cost to business costs JSON."""
         try:
-            data = self._load_business_costs()
+            # Work on the in-memory copy; it is kept current by every write
+            data = self.business_costs or self._load_business_costs()
             costs = data.get("costs", [])
             
             # Add timestamp if not provided
             if 'date_incurred' not in cost_data:
-                cost_data['date_incurred'] = datetime.now().strftime("%Y-%m-%d")
+                cost_data['date_incurred'] = _today_str()
             
             # Add new cost
             costs.append(cost_data)
             
             # Save updated data
             data["costs"] = costs
-            with open(self.costs_file, 'w') as f:
-                json.dump(data, f, indent=4)
+            self._atomic_write_json(self.costs_file, data)
             
             # Update instance data
             self.business_costs = data
             return True, "Cost added successfully"
         except Exception as e:
+            self._json_cache.pop(self.costs_file, None)
+            self.business_costs = self._load_business_costs()
             return False, f"Error adding cost: {str(e)}"
     
     def update_business_cost(self, cost_index, cost_data):
         """Update an existing business cost in business costs JSON."""
         try:
-            data = self._load_business_costs()
+            data = self.business_costs or self._load_business_costs()
             costs = data.get("costs", [])
             
             if 0 <= cost_index < len(costs):
@@ -271,8 +434,7 @@ class CostTracker:
                 
                 # Save updated data
                 data["costs"] = costs
-                with open(self.costs_file, 'w') as f:
-                    json.dump(data, f, indent=4)
+                self._atomic_write_json(self.costs_file, data)
                 
                 # Update instance data
                 self.business_costs = data
@@ -280,12 +442,14 @@ class CostTracker:
             else:
                 return False, "Cost index out of range"
         except Exception as e:
+            self._json_cache.pop(self.costs_file, None)
+            self.business_costs = self._load_business_costs()
             return False, f"Error updating cost: {str(e)}"
     
     def delete_business_cost(self, cost_index):
         """Delete a business cost from business costs JSON."""
         try:
-            data = self._load_business_costs()
+            data = self.business_costs or self._load_business_costs()
             costs = data.get("costs", [])
             
             if 0 <= cost_index < len(costs):
@@ -294,8 +458,7 @@ class CostTracker:
                 
                 # Save updated data
                 data["costs"] = costs
-                with open(self.costs_file, 'w') as f:
-                    json.dump(data, f, indent=4)
+                self._atomic_write_json(self.costs_file, data)
                 
                 # Update instance data
                 self.business_costs = data
@@ -303,58 +466,66 @@ class CostTracker:
             else:
                 return False, "Cost index out of range"
         except Exception as e:
+            self._json_cache.pop(self.costs_file, None)
+            self.business_costs = self._load_business_costs()
             return False, f"Error deleting cost: {str(e)}"
     
     def get_all_electricity_costs(self):
         """Get all electricity costs as a DataFrame."""
+        import pandas as pd
         try:
-            data = self._load_electricity_costs()
-            
-            # Combine all electricity costs into a single list
-            all_costs = []
-            for process_list in data.values():
-                if isinstance(process_list, list):
-                    all_costs.extend(process_list)
-            
-            # Convert to DataFrame
-            if all_costs:
-                df = pd.DataFrame(all_costs)
-                # Sort by process_type and process_name if columns exist
-                if 'process_type' in df.columns and 'process_name' in df.columns:
-                    df = df.sort_values(['process_type', 'process_name'])
-                return df
-            else:
-                # Return empty DataFrame with expected columns
-                return pd.DataFrame(columns=['process_type', 'process_name', 'avg_time_min', 'cost_per_unit_kwh', 'machine_watts', 'usage_w', 'cost_per_run'])
+            return self._get_index(self.electricity_file, 'frame', self._load_electricity_costs,
+                                   self._build_electricity_frame).copy()
         except Exception as e:
             print(f"Error getting electricity costs: {str(e)}")
             return pd.DataFrame()
     
+    def _build_electricity_frame(self, data):
+        """Build the sorted electricity costs frame from electricity costs data."""
+        import pandas as pd
+        # Build one frame per process list and let pandas combine them
+        frames = [pd.DataFrame(process_list) for process_list in data.values()
+                  if isinstance(process_list, list) and process_list]
+        
+        # Convert to DataFrame
+        if frames:
+            df = pd.concat(frames, ignore_index=True, copy=False)
+            # Sort by process_type and process_name if columns exist
+            if 'process_type' in df.columns and 'process_name' in df.columns:
+                df = _sort_frame(df, ['process_type', 'process_name'])
+            return df
+        else:
+            # Return empty DataFrame with expected columns
+            return pd.DataFrame(columns=['process_type', 'process_name', 'avg_time_min', 'cost_per_unit_kwh', 'machine_watts', 'usage_w', 'cost_per_run'])
+    
     def get_all_material_costs(self):
         """Get all material costs as a DataFrame."""
+        import pandas as pd
         try:
-            data = self._load_material_costs()
-            
-            # Combine all material costs into a single list
-            all_costs = []
-            for material_list in data.values():
-                if isinstance(material_list, list):
-                    all_costs.extend(material_list)
-            
-            # Convert to DataFrame
-            if all_costs:
-                df = pd.DataFrame(all_costs)
-                # Sort by material_type and material_name if columns exist
-                if 'material_type' in df.columns and 'material_name' in df.columns:
-                    df = df.sort_values(['material_type', 'material_name'])
-                return df
-            else:
-                # Return empty DataFrame with expected columns
-                return pd.DataFrame(columns=['material_type', 'material_name', 'cost_per_unit', 'unit_measurement', 'unit_value', 'logo_size', 'cost_per_logo'])
+            return self._get_index(self.material_file, 'frame', self._load_material_costs,
+                                   self._build_material_frame).copy()
         except Exception as e:
             print(f"Error getting material costs: {str(e)}")
             return pd.DataFrame()
     
+    def _build_material_frame(self, data):
+        """Build the sorted material costs frame from material costs data."""
+        import pandas as pd
+        # Build one frame per material list and let pandas combine them
+        frames = [pd.DataFrame(material_list) for material_list in data.values()
+                  if isinstance(material_list, list) and material_list]
+        
+        # Convert to DataFrame
+        if frames:
+            df = pd.concat(frames, ignore_index=True, copy=False)
+            # Sort by material_type and material_name if columns exist
+            if 'material_type' in df.columns and 'material_name' in df.columns:
+                df = _sort_frame(df, ['material_type', 'material_name'])
+            return df
+        else:
+            # Return empty DataFrame with expected columns
+            return pd.DataFrame(columns=['material_type', 'material_name', 'cost_per_unit', 'unit_measurement', 'unit_value', 'logo_size', 'cost_per_logo'])
+    
     def get_profit_analysis(self, quote_data):
         """Calculate profit based on quote data and costs using JSON data."""
         # This method can be implemented later if needed
@@ -363,23 +534,13 @@ class CostTracker:
     
     def _get_service_cost_from_file(self, service_id):
         """Get the cost of a service from the services file."""
-        if not os.path.exists(self.services_file):
+        try:
+            mtime = os.stat(self.services_file).st_mtime_ns
+        except FileNotFoundError:
             return None
         
         try:
-            with open(self.services_file, 'r') as f:
-                services_data = json.load(f)
-                
-            # Check printing services
-            for service in services_data.get("printing_services", []):
-                if service.get("id") == service_id:
-                    return service.get("total_cost", 0)
-                
-            # Check embroidery services
-            for service in services_data.get("embroidery_services", []):
-                if service.get("id") == service_id:
-                    return service.get("total_cost", 0)
-                
+            return _load_service_cost_index(os.path.abspath(self.services_file), mtime).get(service_id)
         except Exception as e:
             print(f"Error reading services file: {str(e)}")
         
@@ -387,6 +548,10 @@ class CostTracker:
     
     def calculate_line_item_costs(self, line_item):
         """Calculate simple profit margin: supplier cost vs client revenue."""
+        return self._calculate_line_item_costs(line_item, self._get_service_cost_from_file)
+    
+    def _calculate_line_item_costs(self, line_item, get_service_cost):
+        """Calculate line item costs, resolving service costs through get_service_cost."""
         
         # Get basic data
         base_price = line_item.get("base_price", 0)
@@ -401,34 +566,37 @@ class CostTracker:
         embroidery_service_cost = 0
         
         # Get printing service costs if present
-        if line_item.get("has_printing", False):
+        has_printing = line_item.get("has_printing", False)
+        if has_printing:
             printing_service_id = line_item.get("printing_service_id")
             if printing_service_id:
-                service_cost = self._get_service_cost_from_file(printing_service_id)
+                service_cost = get_service_cost(printing_service_id)
                 if service_cost is not None:
                     printing_service_cost = service_cost * quantity
         
         # Get embroidery service costs if present
-        if line_item.get("has_embroidery", False):
+        has_embroidery = line_item.get("has_embroidery", False)
+        if has_embroidery:
             embroidery_service_id = line_item.get("embroidery_service_id")
             if embroidery_service_id:
-                service_cost = self._get_service_cost_from_file(embroidery_service_id)
+                service_cost = get_service_cost(embroidery_service_id)
                 if service_cost is not None:
                     embroidery_service_cost = service_cost * quantity
         
         # Legacy service handling for backwards compatibility
-        if not line_item.get("has_printing", False) and not line_item.get("has_embroidery", False):
-            services = line_item.get("services", [])
-            for service in services:
+        if not has_printing and not has_embroidery:
+            for service in line_item.get("services", []):
                 service_id = service.get("id", "")
-                if service_id.startswith("print_"):
-                    service_cost = self._get_service_cost_from_file(service_id)
-                    if service_cost is not None:
-                        printing_service_cost += service_cost * quantity
-                elif service_id.startswith("emb_"):
-                    service_cost = self._get_service_cost_from_file(service_id)
-                    if service_cost is not None:
-                        embroidery_service_cost += service_cost * quantity
+                is_printing = service_id.startswith("print_")
+                if not is_printing and not service_id.startswith("emb_"):
+                    continue
+                service_cost = get_service_cost(service_id)
+                if service_cost is None:
+                    continue
+                if is_printing:
+                    printing_service_cost += service_cost * quantity
+                else:
+                    embroidery_service_cost += service_cost * quantity
         
         # Total supplier cost
         total_supplier_cost = supplier_product_cost + printing_service_cost + embroidery_service_cost
@@ -462,18 +630,8 @@ class CostTracker:
             electricity_data = self._load_electricity_costs()
             print_electricity = electricity_data.get("print_electricity", [])
             
-            # Map service_id to relevant process names
-            process_mapping = {
-                "print_1_small": ["Print", "Bake", "Press 1 Logo"],
-                "print_2_small": ["Print", "Bake", "Press 1 Logo", "Press 2 Logo", 
-                                  "Print (2nd small logo)", "Bake (2nd small logo)", 
-                                  "Press 1 Logo (2nd small logo)", "Press 2 Logo (2nd small logo)"],
-                "print_half_back_front": ["Print", "Bake", "Press 1 Logo"],
-                "print_large_back_front": ["Print", "Bake", "Press 1 Logo"]
-            }
-            
             # Get electricity costs for the relevant processes
-            processes = process_mapping.get(service_id, [])
+            processes = _PRINT_PROCESS_MAPPING.get(service_id, ())
             
             for process in processes:
                 matching_process = next((item for item in print_electricity 
@@ -525,15 +683,8 @@ class CostTracker:
             electricity_data = self._load_electricity_costs()
             embroidery_electricity = electricity_data.get("embroidery_electricity", [])
             
-            # Map service_id to relevant process names
-            process_mapping = {
-                "emb_1_small": ["Embroidery Small Logo"],
-                "emb_1_large": ["Embroidery Large Logo"],
-                "emb_front_back": ["Embroidery Small Logo", "Embroidery Large Logo"]
-            }
-            
             # Get electricity costs for the relevant processes
-            processes = process_mapping.get(service_id, [])
+            processes = _EMB_PROCESS_MAPPING.get(service_id, ())
             
             for process in processes:
                 matching_process = next((item for item in embroidery_electricity 
@@ -609,9 +760,36 @@ class CostTracker:
         total_cost = 0
         line_item_results = []
         
+        # Resolve each distinct service once per quote rather than once per line item
+        service_costs = {}
+        def get_service_cost(service_id):
+            if service_id not in service_costs:
+                service_costs[service_id] = self._get_service_cost_from_file(service_id)
+            return service_costs[service_id]
+        
+        # Line items with the same pricing inputs share one calculation
+        line_item_costs = {}
+        def calculate_line_item_costs(item):
+            has_printing = item.get("has_printing", False)
+            has_embroidery = item.get("has_embroidery", False)
+            legacy_ids = None
+            if not has_printing and not has_embroidery:
+                legacy_ids = tuple(service.get("id", "") for service in item.get("services", []))
+            key = (item.get("base_price", 0), item.get("quantity", 0), item.get("total_price", 0),
+                   has_printing, item.get("printing_service_id"),
+                   has_embroidery, item.get("embroidery_service_id"), legacy_ids)
+            try:
+                cached = line_item_costs.get(key)
+            except TypeError:
+                return self._calculate_line_item_costs(item, get_service_cost)
+            if cached is None:
+                cached = line_item_costs[key] = self._calculate_line_item_costs(item, get_service_cost)
+            # Each line item gets its own dict so callers can edit one safely
+            return dict(cached)
+        
         # Calculate costs for each line item
         for item in line_items:
-            item_costs = self.calculate_line_item_costs(item)
+            item_costs = calculate_line_item_costs(item)
             
             # Add line item details to results
             line_item_data = {
@@ -647,21 +825,22 @@ class CostTracker:
     def delete_electricity_cost(self, process_name, process_type):
         """Delete an electricity cost entry by process name and type."""
         try:
-            data = self._load_electricity_costs()
+            data = self.electricity_costs or self._load_electricity_costs()
             
             # Find and remove the cost entry
             target_key = f"{process_type}_electricity"
             if target_key in data:
-                original_length = len(data[target_key])
-                data[target_key] = [item for item in data[target_key] 
-                                   if not (item.get('process_name') == process_name and 
-                                          item.get('process_type') == process_type)]
+                rows = data[target_key]
+                kept = [item for item in rows
+                        if not (item.get('process_name') == process_name and 
+                                item.get('process_type') == process_type)]
                 
-                # Check if anything was removed
-                if len(data[target_key]) < original_length:
+                # Only touch the data and the file if something was removed
+                if len(kept) < len(rows):
+                    data[target_key] = kept
+                    
                     # Save updated data
-                    with open(self.electricity_file, 'w') as f:
-                        json.dump(data, f, indent=4)
+                    self._atomic_write_json(self.electricity_file, data)
                     
                     # Update instance data
                     self.electricity_costs = data
@@ -673,27 +852,30 @@ class CostTracker:
                 print(f"No electricity costs found for process type '{process_type}'")
                 return False
         except Exception as e:
+            self._json_cache.pop(self.electricity_file, None)
+            self.electricity_costs = self._load_electricity_costs()
             print(f"Error deleting electricity cost: {str(e)}")
             return False
     
     def delete_material_cost(self, material_name, material_type):
         """Delete a material cost entry by material name and type."""
         try:
-            data = self._load_material_costs()
+            data = self.material_costs or self._load_material_costs()
             
             # Find and remove the cost entry
             target_key = f"{material_type.lower()}_costs"
             if target_key in data:
-                original_length = len(data[target_key])
-                data[target_key] = [item for item in data[target_key] 
-                                   if not (item.get('material_name') == material_name and 
-                                          item.get('material_type') == material_type)]
+                rows = data[target_key]
+                kept = [item for item in rows
+                        if not (item.get('material_name') == material_name and 
+                                item.get('material_type') == material_type)]
                 
-                # Check if anything was removed
-                if len(data[target_key]) < original_length:
+                # Only touch the data and the file if something was removed
+                if len(kept) < len(rows):
+                    data[target_key] = kept
+                    
                     # Save updated data
-                    with open(self.material_file, 'w') as f:
-                        json.dump(data, f, indent=4)
+                    self._atomic_write_json(self.material_file, data)
                     
                     # Update instance data
                     self.material_costs = data
@@ -705,52 +887,27 @@ class CostTracker:
                 print(f"No material costs found for material type '{material_type}'")
                 return False
         except Exception as e:
+            self._json_cache.pop(self.material_file, None)
+            self.material_costs = self._load_material_costs()
             print(f"Error deleting material cost: {str(e)}")
             return False
     
     def _load_business_costs(self):
         """Load business costs from JSON file or create default."""
-        if os.path.exists(self.costs_file):
-            try:
-                with open(self.costs_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading business costs: {str(e)}")
-                return self._create_default_business_costs()
-        else:
-            return self._create_default_business_costs()
+        return self._load_json(self.costs_file, self._create_default_business_costs, "business costs")
 
     def _create_default_business_costs(self):
         """Create default business costs if file doesn't exist."""
-        default_costs = {
-            "categories": [
-                {"id": 1, "name": "Equipment", "description": "Costs related to equipment purchase and maintenance"},
-                {"id": 2, "name": "Utilities", "description": "Utility costs including electricity, water, etc."},
-                {"id": 3, "name": "Materials", "description": "Materials used in production process"},
-                {"id": 4, "name": "Labor", "description": "Labor costs"},
-                {"id": 5, "name": "Rent", "description": "Rent and property-related costs"},
-                {"id": 6, "name": "Software", "description": "Software and digital services"},
-                {"id": 7, "name": "Other", "description": "Miscellaneous business costs"}
-            ],
-            "costs": [
-                {"category_id": 2, "name": "Electricity", "description": "Monthly electricity bill", "cost_value": 0.4, "cost_type": "per_unit", "date_incurred": datetime.now().strftime("%Y-%m-%d"), "recurring_period": "monthly"},
-                {"category_id": 5, "name": "Workshop Rent", "description": "Monthly workshop rent", "cost_value": 1000, "cost_type": "fixed", "date_incurred": datetime.now().strftime("%Y-%m-%d"), "recurring_period": "monthly"}
-            ],
-            "electricity_rates": {
-                "cost_per_kwh": 0.34
-            },
-            "labor_rates": {
-                "printing": 10.50,
-                "embroidery": 12.00
-            }
-        }
+        default_costs = copy.deepcopy(_DEFAULT_BUSINESS_COSTS)
+        today = _today_str()
+        for cost in default_costs["costs"]:
+            cost["date_incurred"] = today
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(self.costs_file), exist_ok=True)
+        _ensure_parent_dir(self.costs_file)
         
         # Save default costs
-        with open(self.costs_file, 'w') as f:
-            json.dump(default_costs, f, indent=4)
+        self._atomic_write_json(self.costs_file, default_costs)
         
         return default_costs
     
@@ -776,7 +933,9 @@ class CostTracker:
         total_labor_per_item = base_labor_cost + service_labor_per_item
         total_labor = total_labor_per_item * quantity
         
-        print(f"DEBUG: Labor costs - £{base_labor_cost:.2f} base + £{service_labor_per_item:.2f} services = £{total_labor_per_item:.2f} per item")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Labor costs - £%.2f base + £%.2f services = £%.2f per item",
+                         base_labor_cost, service_labor_per_item, total_labor_per_item)
         
         return round(total_labor, 2)
     
@@ -785,12 +944,11 @@ class CostTracker:
         try:
             # Load machine settings to get waste factors
             machine_settings_file = 'app/data/machine_settings.json'
-            if not os.path.exists(machine_settings_file):
+            try:
+                settings = load_json_file(machine_settings_file)
+            except FileNotFoundError:
                 return material_total * 0.05  # Default 5% waste
             
-            with open(machine_settings_file, 'r') as f:
-                settings = json.load(f)
-            
             waste_factors = settings.get('waste_factors', {})
             waste_percentage = waste_factors.get('material_waste_percentage', 5.0) / 100
             
@@ -816,6 +974,8 @@ class CostTracker:
         
         total_depreciation = depreciation_per_item * quantity
         
-        print(f"DEBUG: Depreciation - £{depreciation_per_item:.2f} per item × {quantity} = £{total_depreciation:.2f}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Depreciation - £%.2f per item × %s = £%.2f",
+                         depreciation_per_item, quantity, total_depreciation)
         
-        return round(total_depreciation, 2) 
\ No newline at end of file
+        return round(total_depreciation, 2)
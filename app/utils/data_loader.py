@@ -103,6 +103,26 @@ class DataLoader:
             print(f"Error getting unique values for {column}: {str(e)}")
             return []
     
+    def get_unique_values_bulk(self, columns):
+        """Get unique values for several columns over a single connection, keyed by column name."""
+        values = {column: [] for column in columns}
+        try:
+            conn = sqlite3.connect(self.db_path)
+        except Exception as e:
+            print(f"Error getting unique values for {', '.join(columns)}: {str(e)}")
+            return values
+        
+        try:
+            for column in columns:
+                query = f'SELECT DISTINCT "{column}" FROM products WHERE "{column}" IS NOT NULL ORDER BY "{column}"'
+                try:
+                    values[column] = [row[0] for row in conn.execute(query)]
+                except Exception as e:
+                    print(f"Error getting unique values for {column}: {str(e)}")
+        finally:
+            conn.close()
+        return values
+    
     def get_filtered_products(self, brand=None, product_group=None, primary_category=None, product_name=None, web_size=None, colour_name=None):
         """Get products filtered by the selected criteria."""
         try:
@@ -0,0 +1,63 @@
+import os
+import json
+import tempfile
+
+# Use orjson for faster parsing when it is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def load_json_file(path):
+    """Load a JSON file, using orjson when available."""
+    with open(path, 'rb') as f:
+        content = f.read()
+    
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def dump_json_bytes(data, indent=True):
+    """Serialize data to JSON bytes, indented unless asked otherwise.
+    
+    Indented output always uses the standard library's 4-space layout, matching the
+    checked-in data files (orjson only supports 2 spaces). Compact output uses orjson
+    when available.
+    """
+    if indent:
+        return json.dumps(data, indent=4).encode('utf-8')
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode('utf-8')
+
+def _file_mode(path):
+    """Permissions of an existing file, or the umask default for a new one."""
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+def write_json_file(path, data, indent=True):
+    """
+    Serialize data in one pass and write it to a temporary file in a single
+    buffered write, then swap it into place so readers never see a partial file.
+    Each write gets its own temporary file, so concurrent writers can't clash.
+    """
+    content = dump_json_bytes(data, indent=indent)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb', buffering=1 << 20) as f:
+            f.write(content)
+        # mkstemp creates the file owner-only; keep the permissions a plain open() would give
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except OSError:
+        # Don't leave a half-written temporary file behind
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -1,7 +1,7 @@
-import json
 import os
 import uuid
 from datetime import datetime
+from app.utils.json_io import load_json_file, write_json_file
 
 class ServiceLoader:
     def __init__(self, services_file='app/data/printing_embroidery.json'):
@@ -11,14 +11,12 @@ class ServiceLoader:
         
     def _load_services(self):
         """Load services from JSON file or create default."""
-        if os.path.exists(self.services_file):
-            try:
-                with open(self.services_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading services: {str(e)}")
-                return self._create_default_services()
-        else:
+        try:
+            return load_json_file(self.services_file)
+        except FileNotFoundError:
+            return self._create_default_services()
+        except Exception as e:
+            print(f"Error loading services: {str(e)}")
             return self._create_default_services()
     
     def _create_default_services(self):
@@ -32,16 +30,14 @@ class ServiceLoader:
         os.makedirs(os.path.dirname(self.services_file), exist_ok=True)
         
         # Save default services
-        with open(self.services_file, 'w') as f:
-            json.dump(default_services, f, indent=4)
+        write_json_file(self.services_file, default_services)
         
         return default_services
     
     def save_services(self):
         """Save the current services to the JSON file."""
         try:
-            with open(self.services_file, 'w') as f:
-                json.dump(self.services, f, indent=4)
+            write_json_file(self.services_file, self.services)
             return True, "Services saved successfully"
         except Exception as e:
             return False, f"Error saving services: {str(e)}"
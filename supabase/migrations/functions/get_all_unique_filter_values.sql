@@ -0,0 +1,11 @@
+-- Create a function to get the distinct values of all filter columns in the products table
+-- A single scan of the table returns the options for every filter dropdown at once
+CREATE OR REPLACE FUNCTION get_all_unique_filter_values()
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'Brand', COALESCE(jsonb_agg(DISTINCT "Brand" ORDER BY "Brand") FILTER (WHERE "Brand" IS NOT NULL), '[]'::JSONB),
+        'Product Group', COALESCE(jsonb_agg(DISTINCT "Product Group" ORDER BY "Product Group") FILTER (WHERE "Product Group" IS NOT NULL), '[]'::JSONB),
+        'Primary Category', COALESCE(jsonb_agg(DISTINCT "Primary Category" ORDER BY "Primary Category") FILTER (WHERE "Primary Category" IS NOT NULL), '[]'::JSONB)
+    )
+    FROM products;
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
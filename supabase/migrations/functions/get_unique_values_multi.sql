@@ -0,0 +1,31 @@
+-- Create a function to get distinct values for several columns of the products table in one call
+-- This is used by the CloudDataLoader to populate all dropdown options with a single round-trip
+CREATE OR REPLACE FUNCTION get_unique_values_multi(column_names TEXT[])
+RETURNS JSONB AS $$
+DECLARE
+    result JSONB := '{}'::JSONB;
+    col TEXT;
+    vals JSONB;
+BEGIN
+    -- Validate input to prevent SQL injection
+    IF column_names IS NULL THEN
+        RAISE EXCEPTION 'Invalid column names';
+    END IF;
+
+    FOREACH col IN ARRAY column_names LOOP
+        IF col IS NULL OR col = '' THEN
+            RAISE EXCEPTION 'Invalid column name';
+        END IF;
+
+        -- Collect the sorted distinct values of this column as a JSON array
+        EXECUTE format(
+            'SELECT COALESCE(jsonb_agg(value ORDER BY value), ''[]''::JSONB) FROM (SELECT DISTINCT %I::TEXT AS value FROM products WHERE %I IS NOT NULL) t',
+            col, col
+        ) INTO vals;
+
+        result := result || jsonb_build_object(col, vals);
+    END LOOP;
+
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;